@@ -2,9 +2,13 @@
 Test script for debugging LLM agent responses.
 Tests a single response using prompt.txt and game_state.txt in this folder.
 
+All completions are sent concurrently. For Ollama, start the server with
+OLLAMA_NUM_PARALLEL set (e.g. 8) so it batches them instead of queueing.
+
 Usage: python test_acquired.py
 """
 
+import asyncio
 import sys
 import re
 from pathlib import Path
@@ -18,6 +22,8 @@ load_dotenv(project_root / ".env")
 
 from engine.llm_client import LLMClient
 
+_NUMBER_RE = re.compile(r'\d+')
+
 
 def load_prompt() -> str:
     """Load system prompt from prompt.txt"""
@@ -44,13 +50,49 @@ def parse_bid(response: str) -> int:
         return 0
     
     # Try to find first number in response
-    numbers = re.findall(r'\d+', response)
-    if numbers:
-        return int(numbers[0])
+    match = _NUMBER_RE.search(response)
+    if match:
+        return int(match.group())
     
     return 0
 
 
+async def run_tests(client: LLMClient, system_prompt: str, game_state: str, num_tests: int) -> list[dict]:
+    """Fire all completions concurrently (bounded by the client) and collect results in order."""
+    requests = [(system_prompt, game_state, 1.5)] * num_tests
+    try:
+        responses = await client.chat_many_async(requests, return_exceptions=True)
+    finally:
+        await client.aclose()
+    
+    results = []
+    for i, response in enumerate(responses, 1):
+        print(f"\n[Test {i}/{num_tests}]", end=" ")
+        
+        if isinstance(response, BaseException):
+            print(f"❌ Error: {response}")
+            results.append({
+                "test_num": i,
+                "response": None,
+                "bid": 0,
+                "success": False,
+                "error": str(response)
+            })
+            continue
+        
+        bid = parse_bid(response)
+        results.append({
+            "test_num": i,
+            "response": response,
+            "bid": bid,
+            "success": response is not None
+        })
+        
+        print(f"Bid: {bid:>4d} | Response: {response[:50]}..." if response else "Bid: 0 (empty)")
+    
+    return results
+
+
 def main():
     print("=" * 60)
     print("TEST ACQUIRED LOGIC - Multiple Response Test")
@@ -68,48 +110,19 @@ def main():
     # Initialize LLM client
     print("\n🤖 Initializing LLM client...")
     try:
-        client = LLMClient()
+        client = LLMClient(prewarm=False)
         print(f"   Provider: {client.get_display_name()}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
         return 1
     
-    # Run 10 tests
+    # Run 10 tests concurrently
     NUM_TESTS = 10
-    results = []
     
     print(f"\n🔄 Running {NUM_TESTS} tests...")
     print("=" * 60)
     
-    for i in range(1, NUM_TESTS + 1):
-        print(f"\n[Test {i}/{NUM_TESTS}]", end=" ")
-        
-        try:
-            response = client.chat_completion(
-                system_prompt=system_prompt,
-                user_message=game_state,
-                temperature=1.5
-            )
-            
-            bid = parse_bid(response)
-            results.append({
-                "test_num": i,
-                "response": response,
-                "bid": bid,
-                "success": response is not None
-            })
-            
-            print(f"Bid: {bid:>4d} | Response: {response[:50]}..." if response else "Bid: 0 (empty)")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            results.append({
-                "test_num": i,
-                "response": None,
-                "bid": 0,
-                "success": False,
-                "error": str(e)
-            })
+    results = asyncio.run(run_tests(client, system_prompt, game_state, NUM_TESTS))
     
     client.close()
     
@@ -3,15 +3,112 @@ LLM Client for communicating with LLM APIs.
 Supports: Google Gemini (via google-genai) and Ollama (OpenAI-compatible).
 """
 
+import asyncio
+import atexit
 import httpx
 import json
 import logging
 import os
+import random
 import re
-from typing import Optional
+import threading
+import time
+from typing import Any, Optional
+
+from . import fastjson
 
 logger = logging.getLogger(__name__)
 
+# Leading (optionally negative) integer of an LLM bid response
+_BID_RE = re.compile(r'-?\d+')
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Process-wide client pools shared by every LLMClient (one warm connection pool
+# for all teams). Async clients (httpx.AsyncClient, genai aio) are not shared:
+# they are bound to an event loop.
+_GOOGLE_CLIENTS: dict[str, Any] = {}
+_HTTP_CLIENTS: dict[tuple, httpx.Client] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _close_shared_clients() -> None:
+    """Close all pooled HTTP clients (registered with atexit)."""
+    with _POOL_LOCK:
+        for client in _HTTP_CLIENTS.values():
+            client.close()
+        _HTTP_CLIENTS.clear()
+        _GOOGLE_CLIENTS.clear()
+
+
+atexit.register(_close_shared_clients)
+
+
+# HTTP statuses worth retrying after a backoff (rate limiting and transient server errors)
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an error from a provider call should be retried after a backoff."""
+    if isinstance(error, (httpx.TransportError, TimeoutError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRYABLE_STATUS
+    # google-genai APIError carries the HTTP status in .code
+    return getattr(error, "code", None) in _RETRYABLE_STATUS
+
+
+def _retry_after(error: Exception) -> float:
+    """Seconds requested by a Retry-After header, or 0 if absent/unparseable."""
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            return float(error.response.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+class _RateLimiter:
+    """
+    Token bucket shared by all calls of one client: allows bursts of up to
+    requests_per_minute calls, refilled continuously at requests_per_minute / 60 per second.
+    Callers reserve a token and sleep until it is theirs, so waiting is FIFO-fair.
+    """
+    
+    def __init__(self, requests_per_minute: int):
+        self.capacity = float(requests_per_minute)
+        self.fill_rate = requests_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.fill_rate
+    
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _has_complete_bid(buffer: str) -> bool:
+    """True once the streamed text starts with an integer followed by a non-digit."""
+    text = buffer.lstrip()
+    match = _BID_RE.match(text)
+    return match is not None and match.end() < len(text)
+
 
 class LLMClient:
     """
@@ -24,7 +121,22 @@ class LLMClient:
         provider: str = "google",
         model: str = None,
         base_url: str = "http://localhost:11434/v1",
-        timeout: float = 60.0
+        timeout: float = 60.0,
+        request_timeout: float = 60.0,
+        request_deadline: Optional[float] = None,
+        retry_backoff: float = 0.5,
+        max_connections: int = 64,
+        max_keepalive: int = 32,
+        keepalive_expiry: float = 30.0,
+        shared_pool: bool = True,
+        prewarm: bool = True,
+        max_concurrency: int = 8,
+        max_output_tokens: Optional[int] = 8,
+        stop_at_newline: bool = True,
+        requests_per_minute: Optional[int] = None,
+        max_backoff: float = 16.0,
+        connect_timeout: float = 5.0,
+        http2: bool = False
     ):
         """
         Initialize LLM client.
@@ -33,7 +145,24 @@ class LLMClient:
             provider: "google" or "ollama"
             model: Model name (required, from .env LLM_MODEL)
             base_url: Base URL for Ollama API (ignored for Google)
-            timeout: Request timeout in seconds
+            timeout: Client-level timeout in seconds (upper bound for any request)
+            request_timeout: Per-call timeout; a slow call is abandoned and retried
+            request_deadline: Total seconds one completion may spend across all retries
+                (None = max_retries * (request_timeout + max_backoff), i.e. every attempt fits)
+            retry_backoff: Base delay for exponential backoff after a timed-out call
+            max_connections: Connection pool size for the Ollama HTTP clients
+            max_keepalive: Idle keep-alive connections retained in the pool
+            keepalive_expiry: Seconds an idle keep-alive connection is kept open
+            shared_pool: Reuse the process-wide sync HTTP / Gemini client instead of owning one
+            prewarm: Open the sync provider connection in the background so the first
+                blocking call skips the handshake (async callers use aprewarm instead)
+            max_concurrency: Max in-flight requests in chat_many_async (match OLLAMA_NUM_PARALLEL)
+            max_output_tokens: Completion token cap; a bid is a single integer (~3 tokens) (None = no cap)
+            stop_at_newline: Stop generation at the first newline (disable for chatty models)
+            requests_per_minute: Provider rate limit shared by all calls (None = unlimited)
+            max_backoff: Upper bound in seconds for a single retry delay
+            connect_timeout: Seconds to wait for a TCP/TLS connection before failing fast
+            http2: Negotiate HTTP/2 with the Ollama endpoint (requires: pip install httpx[http2])
         """
         self.provider = provider.lower()
         self.model = model or os.getenv("LLM_MODEL")
@@ -41,6 +170,23 @@ class LLMClient:
             raise ValueError("LLM_MODEL not set. Set it in .env file.")
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.request_deadline = request_deadline
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._rate_limiter = _RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.connect_timeout = connect_timeout
+        self.http_timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.shared_pool = shared_pool
+        self.max_concurrency = max_concurrency
+        self.max_output_tokens = max_output_tokens
+        self.stop_sequences = ["\n"] if stop_at_newline else None
         
         # Disable verbose logging from dependencies
         httpx_logger = logging.getLogger("httpx")
@@ -56,8 +202,38 @@ class LLMClient:
         else:
             raise ValueError(f"Unsupported provider: {provider}. Use 'google' or 'ollama'.")
         
+        if prewarm:
+            threading.Thread(target=self._prewarm, name="llm-prewarm", daemon=True).start()
+        
         logger.info(f"LLMClient initialized: {self.get_display_name()}")
     
+    def _prewarm(self) -> None:
+        """
+        Establish the TCP/TLS connection with a cheap request so the first real
+        completion reuses a warm keep-alive session. Errors are ignored.
+        """
+        try:
+            if self.provider == "google":
+                self._google_client.models.list()
+            elif self.provider == "ollama":
+                self._http_client.get(f"{self.base_url}/models", timeout=2.0)
+        except Exception as e:
+            logger.debug(f"Connection prewarm failed (ignored): {e}")
+    
+    async def aprewarm(self, timeout: float = 2.0) -> None:
+        """
+        Async counterpart of the prewarm: opens the async client's connection on
+        the running loop, which is the one the async calls will reuse.
+        Gives up after timeout seconds; errors are ignored.
+        """
+        try:
+            if self.provider == "google":
+                await asyncio.wait_for(self._google_aio.models.list(), timeout)
+            elif self.provider == "ollama":
+                await self._http_async.get(f"{self.base_url}/models", timeout=timeout)
+        except Exception as e:
+            logger.debug(f"Connection prewarm failed (ignored): {e}")
+    
     def _init_google(self):
         """Initialize Google Gemini client."""
         try:
@@ -74,13 +250,56 @@ class LLMClient:
                 "Get your key from https://aistudio.google.com/"
             )
         
-        self._google_client = genai.Client(api_key=api_key)
+        if self.shared_pool:
+            with _POOL_LOCK:
+                if api_key not in _GOOGLE_CLIENTS:
+                    _GOOGLE_CLIENTS[api_key] = genai.Client(api_key=api_key)
+                self._google_client = _GOOGLE_CLIENTS[api_key]
+            # The aio connections are bound to the loop that first used them,
+            # so async calls get a client of their own rather than the shared one
+            self._google_aio = genai.Client(api_key=api_key).aio
+        else:
+            self._google_client = genai.Client(api_key=api_key)
+            self._google_aio = self._google_client.aio
         self._http_client = None
+        self._http_async = None
     
     def _init_ollama(self):
-        """Initialize Ollama HTTP client."""
-        self._http_client = httpx.Client(timeout=self.timeout)
+        """
+        Initialize Ollama HTTP clients (sync for the engine, async for concurrent callers).
+        
+        Ollama only batches concurrent requests when the *server* is started with
+        OLLAMA_NUM_PARALLEL (and OLLAMA_MAX_LOADED_MODELS) set; otherwise requests
+        fired concurrently are still processed one at a time.
+        """
+        num_parallel = os.getenv("OLLAMA_NUM_PARALLEL")
+        if num_parallel:
+            logger.info(f"OLLAMA_NUM_PARALLEL={num_parallel}")
+        else:
+            logger.warning(
+                "OLLAMA_NUM_PARALLEL is not set; concurrent requests may be serialized "
+                "by the Ollama server. Start it with e.g. OLLAMA_NUM_PARALLEL=8 ollama serve"
+            )
+        if self.shared_pool:
+            key = (
+                self.base_url, self.timeout, self.connect_timeout, self.http2, self.limits.max_connections,
+                self.limits.max_keepalive_connections, self.limits.keepalive_expiry
+            )
+            with _POOL_LOCK:
+                if key not in _HTTP_CLIENTS:
+                    _HTTP_CLIENTS[key] = httpx.Client(
+                        timeout=self.http_timeout, limits=self.limits, http2=self.http2
+                    )
+                self._http_client = _HTTP_CLIENTS[key]
+        else:
+            self._http_client = httpx.Client(
+                timeout=self.http_timeout, limits=self.limits, http2=self.http2
+            )
+        self._http_async = httpx.AsyncClient(
+            timeout=self.http_timeout, limits=self.limits, http2=self.http2
+        )
         self._google_client = None
+        self._google_aio = None
     
     def get_display_name(self) -> str:
         """Get human-readable provider and model name."""
@@ -90,6 +309,25 @@ class LLMClient:
             return f"Ollama ({self.model}) @ {self.base_url}"
         return f"{self.provider} ({self.model})"
     
+    def _backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Exponential backoff with jitter: base * 2**attempt + U(0, base), capped at
+        max_backoff. A longer Retry-After from the provider takes precedence.
+        """
+        delay = min(
+            self.max_backoff,
+            self.retry_backoff * (2 ** attempt) + random.uniform(0, self.retry_backoff)
+        )
+        if error is not None:
+            delay = max(delay, _retry_after(error))
+        return delay
+    
+    def _deadline(self, max_retries: int) -> float:
+        """Total seconds a completion may take across max_retries attempts."""
+        if self.request_deadline is not None:
+            return self.request_deadline
+        return max_retries * (self.request_timeout + self.max_backoff)
+    
     def chat_completion(
         self,
         system_prompt: str,
@@ -109,7 +347,14 @@ class LLMClient:
         Returns:
             The assistant's response text, or None if all retries failed
         """
+        deadline = self._deadline(max_retries)
+        started = time.monotonic()
         for attempt in range(max_retries):
+            if time.monotonic() - started > deadline:
+                logger.error(f"Request deadline of {deadline}s exceeded, giving up")
+                return None
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
             try:
                 if self.provider == "google":
                     response = self._chat_google(system_prompt, user_message, temperature)
@@ -127,48 +372,177 @@ class LLMClient:
                     logger.warning(f"Empty response, retrying... (attempt {attempt + 1}/{max_retries})")
                     
             except Exception as e:
-                if attempt < max_retries - 1:
+                if attempt >= max_retries - 1:
+                    logger.error(f"All {max_retries} attempts failed: {e}")
+                elif _is_transient(e):
+                    # Timeouts, rate limits (429) and 5xx: back off before retrying
+                    delay = self._backoff_delay(attempt, e)
+                    logger.warning(
+                        f"Transient error: {e}, retrying in {delay:.2f}s... "
+                        f"(attempt {attempt + 1}/{max_retries})"
+                    )
+                    time.sleep(delay)
+                else:
                     logger.warning(f"Request failed: {e}, retrying... (attempt {attempt + 1}/{max_retries})")
+        
+        logger.error(f"Failed to get valid response after {max_retries} attempts")
+        return None
+    
+    async def chat_completion_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float = 0.7,
+        max_retries: int = 7
+    ) -> Optional[str]:
+        """
+        Async variant of chat_completion with the same retry semantics.
+        
+        Lets callers fire many completions at once (e.g. via asyncio.gather)
+        so network latency overlaps instead of adding up.
+        
+        Args:
+            system_prompt: The system prompt defining agent behavior
+            user_message: The user message (game state context)
+            temperature: Sampling temperature
+            max_retries: Maximum number of retry attempts
+            
+        Returns:
+            The assistant's response text, or None if all retries failed
+        """
+        deadline = self._deadline(max_retries)
+        started = time.monotonic()
+        for attempt in range(max_retries):
+            if time.monotonic() - started > deadline:
+                logger.error(f"Request deadline of {deadline}s exceeded, giving up")
+                return None
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async()
+            try:
+                if self.provider == "google":
+                    response = await self._chat_google_async(system_prompt, user_message, temperature)
+                elif self.provider == "ollama":
+                    response = await self._chat_ollama_async(system_prompt, user_message, temperature)
                 else:
+                    return None
+                
+                if response and response.strip():
+                    return response
+                
+                if attempt < max_retries - 1:
+                    logger.warning(f"Empty response, retrying... (attempt {attempt + 1}/{max_retries})")
+                    
+            except Exception as e:
+                if attempt >= max_retries - 1:
                     logger.error(f"All {max_retries} attempts failed: {e}")
+                elif _is_transient(e):
+                    # Timeouts, rate limits (429) and 5xx: back off before retrying
+                    delay = self._backoff_delay(attempt, e)
+                    logger.warning(
+                        f"Transient error: {e}, retrying in {delay:.2f}s... "
+                        f"(attempt {attempt + 1}/{max_retries})"
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    logger.warning(f"Request failed: {e}, retrying... (attempt {attempt + 1}/{max_retries})")
         
         logger.error(f"Failed to get valid response after {max_retries} attempts")
         return None
     
+    def _google_config(self, system_prompt: str, temperature: float):
+        """Generation config shared by the sync and async Gemini calls."""
+        from google.genai import types
+        
+        return types.GenerateContentConfig(
+            system_instruction=system_prompt,
+            temperature=temperature,
+            max_output_tokens=self.max_output_tokens,
+            stop_sequences=self.stop_sequences,
+            http_options=types.HttpOptions(timeout=int(self.request_timeout * 1000)),
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(
+                disable=True
+            )
+        )
+    
+    async def chat_many_async(
+        self,
+        requests: list[tuple[str, str, float]],
+        return_exceptions: bool = False
+    ) -> list[Optional[str] | BaseException]:
+        """
+        Run several completions concurrently, at most max_concurrency at a time.
+        
+        Args:
+            requests: (system_prompt, user_message, temperature) per completion
+            return_exceptions: Return an exception raised by a call in its slot
+                instead of propagating it (as asyncio.gather does)
+            
+        Returns:
+            Responses in the same order as requests (None where a call failed;
+            the raised exception itself where return_exceptions is set)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def one(system_prompt: str, user_message: str, temperature: float) -> Optional[str]:
+            async with semaphore:
+                return await self.chat_completion_async(system_prompt, user_message, temperature)
+        
+        return await asyncio.gather(*(one(*r) for r in requests), return_exceptions=return_exceptions)
+    
     def _chat_google(
         self,
         system_prompt: str,
         user_message: str,
         temperature: float
     ) -> Optional[str]:
-        """Google Gemini API using google-genai library."""
-        from google import genai
-        from google.genai import types
-        
+        """
+        Google Gemini API using google-genai library.
+        Streams the response and stops as soon as a complete leading integer
+        (the bid) has arrived, instead of waiting for the full completion.
+        """
+        buffer = ""
         try:
-            response = self._google_client.models.generate_content(
+            stream = self._google_client.models.generate_content_stream(
                 model=self.model,
                 contents=user_message,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    temperature=temperature,
-                    max_output_tokens=50,
-                    automatic_function_calling=types.AutomaticFunctionCallingConfig(
-                        disable=True
-                    )
-                )
+                config=self._google_config(system_prompt, temperature)
             )
+            try:
+                for chunk in stream:
+                    buffer += chunk.text or ""
+                    if _has_complete_bid(buffer):
+                        break
+            finally:
+                stream.close()
             
-            if response.text:
-                return response.text.strip()
+            if buffer.strip():
+                return buffer.strip()
             
             logger.warning("Empty response from Google Gemini")
             return None
             
         except Exception as e:
+            if _is_transient(e):
+                raise
             logger.error(f"Google Gemini API error: {e}")
             return None
     
+    def _ollama_payload(self, system_prompt: str, user_message: str, temperature: float) -> dict:
+        """Request body shared by the sync and async Ollama calls."""
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            "temperature": temperature
+        }
+        if self.max_output_tokens is not None:
+            payload["max_tokens"] = self.max_output_tokens
+        if self.stop_sequences:
+            payload["stop"] = self.stop_sequences
+        return payload
+    
     def _chat_ollama(
         self,
         system_prompt: str,
@@ -177,31 +551,98 @@ class LLMClient:
     ) -> Optional[str]:
         """Ollama OpenAI-compatible API."""
         url = f"{self.base_url}/chat/completions"
-        
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            "temperature": temperature,
-            "max_tokens": 50
-        }
+        payload = self._ollama_payload(system_prompt, user_message, temperature)
         
         try:
-            response = self._http_client.post(url, json=payload)
+            response = self._http_client.post(
+                url,
+                content=fastjson.dumps_bytes(payload),
+                headers=_JSON_HEADERS,
+                timeout=self.request_timeout
+            )
             response.raise_for_status()
             
-            data = response.json()
+            data = fastjson.loads(response.content)
             content = data["choices"][0]["message"]["content"]
             return content.strip()
             
         except httpx.HTTPStatusError as e:
+            if _is_transient(e):
+                raise
             logger.error(f"Ollama HTTP error: {e.response.status_code} - {e.response.text}")
             return None
-        except httpx.RequestError as e:
-            logger.error(f"Ollama request error: {e}")
+        except httpx.TransportError:
+            # Timeouts and connection errors are retried with backoff by the caller
+            raise
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to parse Ollama response: {e}")
+            return None
+    
+    async def _chat_google_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float
+    ) -> Optional[str]:
+        """Google Gemini API using the google-genai async (aio) interface, streamed like _chat_google."""
+        buffer = ""
+        try:
+            stream = await self._google_aio.models.generate_content_stream(
+                model=self.model,
+                contents=user_message,
+                config=self._google_config(system_prompt, temperature)
+            )
+            try:
+                async for chunk in stream:
+                    buffer += chunk.text or ""
+                    if _has_complete_bid(buffer):
+                        break
+            finally:
+                await stream.aclose()
+            
+            if buffer.strip():
+                return buffer.strip()
+            
+            logger.warning("Empty response from Google Gemini")
+            return None
+            
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            logger.error(f"Google Gemini API error: {e}")
+            return None
+    
+    async def _chat_ollama_async(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: float
+    ) -> Optional[str]:
+        """Ollama OpenAI-compatible API over httpx.AsyncClient."""
+        url = f"{self.base_url}/chat/completions"
+        payload = self._ollama_payload(system_prompt, user_message, temperature)
+        
+        try:
+            response = await self._http_async.post(
+                url,
+                content=fastjson.dumps_bytes(payload),
+                headers=_JSON_HEADERS,
+                timeout=self.request_timeout
+            )
+            response.raise_for_status()
+            
+            data = fastjson.loads(response.content)
+            content = data["choices"][0]["message"]["content"]
+            return content.strip()
+            
+        except httpx.HTTPStatusError as e:
+            if _is_transient(e):
+                raise
+            logger.error(f"Ollama HTTP error: {e.response.status_code} - {e.response.text}")
             return None
+        except httpx.TransportError:
+            # Timeouts and connection errors are retried with backoff by the caller
+            raise
         except (KeyError, IndexError, json.JSONDecodeError) as e:
             logger.error(f"Failed to parse Ollama response: {e}")
             return None
@@ -227,7 +668,7 @@ class LLMClient:
         cleaned = response.strip()
         
         # Try to extract just the first number found
-        match = re.search(r'^-?\d+', cleaned)
+        match = _BID_RE.match(cleaned)
         
         if match:
             try:
@@ -244,10 +685,18 @@ class LLMClient:
         return 0
     
     def close(self):
-        """Close the HTTP client."""
-        if self._http_client:
+        """Close the HTTP client (shared pooled clients are closed at interpreter exit)."""
+        if self._http_client and not self.shared_pool:
             self._http_client.close()
     
+    async def aclose(self):
+        """Close the async HTTP clients (must be awaited inside the running loop)."""
+        if self._http_async:
+            await self._http_async.aclose()
+        # AsyncClient.aclose only exists in newer google-genai releases
+        if self._google_aio is not None and hasattr(self._google_aio, "aclose"):
+            await self._google_aio.aclose()
+    
     def __enter__(self):
         return self
     
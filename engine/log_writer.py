@@ -0,0 +1,70 @@
+"""
+Background file writer for session logs.
+"""
+
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """
+    Writes files on a daemon thread, so session log I/O overlaps with the
+    next auction's LLM calls instead of delaying them.
+
+    Writes are applied in the order they were submitted, so an append
+    queued after a create always lands after it.
+    """
+
+    def __init__(self):
+        """Initialize the writer; the thread starts on the first write."""
+        self._queue: queue.Queue[Optional[tuple[Path, str, bool]]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, path: Path, text: str, append: bool = False) -> None:
+        """
+        Queue text to be written to path.
+
+        Args:
+            path: Destination file
+            text: Full content (or the part to append)
+            append: Append to the file instead of replacing it
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="session-log-writer", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((path, text, append))
+
+    def flush(self) -> None:
+        """Block until every queued write has been applied."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Apply pending writes and stop the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """Writer thread: apply queued writes until the stop marker arrives."""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                path, text, append = job
+                with open(path, "a" if append else "w", newline="", encoding="utf-8") as f:
+                    f.write(text)
+            except OSError as e:
+                logger.error(f"Failed to write session log {job[0]}: {e}")
+            finally:
+                self._queue.task_done()
@@ -3,12 +3,21 @@ Data models for the Wolf of Allegro auction game.
 """
 
 import json
-from pydantic import BaseModel, Field
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Optional
 
+from . import fastjson
+
+# Config for models that are never mutated after construction: assignment is
+# rejected instead of validated, and unknown keys are dropped.
+FROZEN = ConfigDict(frozen=True, validate_assignment=False, extra="ignore")
+
 
 class Item(BaseModel):
     """Represents an auction item."""
+    model_config = FROZEN
+    
     name: str = Field(..., description="Unique item name")
     quality: int = Field(..., ge=0, le=100, description="Item quality (0-100, junk items have 0)")
     is_required: bool = Field(..., description="Whether this item is required to win")
@@ -29,6 +38,8 @@ class Item(BaseModel):
 
 class Bid(BaseModel):
     """Represents a bid made by a team."""
+    model_config = FROZEN
+    
     team_name: str = Field(..., description="Name of the bidding team")
     amount: int = Field(..., ge=0, description="Bid amount")
     iteration: int = Field(..., ge=1, description="Iteration number when bid was made")
@@ -36,6 +47,8 @@ class Bid(BaseModel):
 
 class AuctionResult(BaseModel):
     """Result of a single item auction."""
+    model_config = FROZEN
+    
     item: Item
     winning_team: Optional[str] = Field(None, description="Name of winning team, None if no valid bids")
     winning_bid: int = Field(0, description="Winning bid amount")
@@ -47,7 +60,54 @@ class TeamState(BaseModel):
     """Current state of a team during the game."""
     name: str = Field(..., description="Team name (matches prompt file name)")
     budget: int = Field(..., ge=0, description="Remaining budget")
-    acquired_items: list[Item] = Field(default_factory=list, description="Items won by this team")
+    acquired_items: tuple[Item, ...] = Field((), description="Items won by this team (grown by add_acquired)")
+    
+    # Score counters derived from acquired_items. add_acquired() updates them
+    # in O(1); if the tuple is replaced any other way, the identity check in
+    # _scores() notices and recounts.
+    _best_quality: dict[str, int] = PrivateAttr(default_factory=dict)
+    _total_quality: int = PrivateAttr(0)
+    _scored_items: Optional[tuple[Item, ...]] = PrivateAttr(None)
+    
+    def _count_item(self, item: Item) -> None:
+        """Fold one acquired item into the score counters."""
+        if not item.is_required:
+            return
+        previous = self._best_quality.get(item.name)
+        if previous is None:
+            self._best_quality[item.name] = item.quality
+            self._total_quality += item.quality
+        elif item.quality > previous:
+            self._best_quality[item.name] = item.quality
+            self._total_quality += item.quality - previous
+    
+    def _scores(self) -> dict[str, int]:
+        """Best quality per required item name, recounted if acquired_items was replaced."""
+        if self._scored_items is not self.acquired_items:
+            self._best_quality = {}
+            self._total_quality = 0
+            for item in self.acquired_items:
+                self._count_item(item)
+            self._scored_items = self.acquired_items
+        return self._best_quality
+    
+    def add_acquired(self, item: Item, price: int) -> None:
+        """Record a won item: pay for it and update the score counters."""
+        self._scores()
+        self.budget -= price
+        self.acquired_items += (item,)
+        self._count_item(item)
+        self._scored_items = self.acquired_items
+    
+    def snapshot(self) -> "TeamState":
+        """
+        Independent copy of this state for read-only consumers.
+        Items and the acquired_items tuple are immutable, so they are shared;
+        only the counter dict that add_acquired() mutates is copied.
+        """
+        copy = self.model_copy()
+        copy._best_quality = dict(self._best_quality)
+        return copy
     
     @property
     def unique_required_items(self) -> dict[str, Item]:
@@ -65,7 +125,7 @@ class TeamState(BaseModel):
     @property
     def required_count(self) -> int:
         """Number of UNIQUE required items acquired (by name)."""
-        return len(self.unique_required_items)
+        return len(self._scores())
     
     @property
     def total_quality(self) -> int:
@@ -73,7 +133,12 @@ class TeamState(BaseModel):
         Sum of quality of unique required items.
         For items with same name, takes the highest quality version.
         """
-        return sum(item.quality for item in self.unique_required_items.values())
+        self._scores()
+        return self._total_quality
+    
+    def to_json_dict(self) -> dict:
+        """Team state in specification JSON format (the TeamJSON shape)."""
+        return _team_dict(self)
 
 
 # === JSON Format Models (matching specification) ===
@@ -120,21 +185,75 @@ class GameStateJSON(BaseModel):
     OpponentTeams: list[TeamJSON]
 
 
+def _item_dict(item: Item) -> dict:
+    """Item in specification JSON format."""
+    return {"Name": item.name, "Quality": item.quality, "IsRequired": item.is_required}
+
+
+def items_to_json(items: list[Item]) -> str:
+    """
+    The all_items list in specification JSON format, as sent to the teams
+    and saved to all_items.json (2-space indented, ASCII-escaped).
+    """
+    return json.dumps([_item_dict(i) for i in items], indent=2)
+
+
+def _team_dict(team: TeamState) -> dict:
+    """Team state in specification JSON format."""
+    return {
+        "Name": team.name,
+        "Budget": team.budget,
+        "Acquired": [_item_dict(i) for i in team.acquired_items]
+    }
+
+
+def _reindent(fragment: str, depth: int) -> str:
+    """Shift a pretty-printed JSON fragment to the given nesting depth."""
+    # Newlines inside JSON strings are escaped, so every raw newline is layout
+    return fragment.replace("\n", "\n" + "  " * depth)
+
+
+def assemble_prompt_context(current_round: str, your_team: str, opponent_teams: list[str]) -> str:
+    """
+    Join pre-rendered fragments into the text GameState.to_prompt_context() returns.
+    
+    Each fragment is a value serialized on its own with fastjson.dumps(..., indent=True),
+    so fragments shared by many game states only have to be serialized once.
+    
+    Args:
+        current_round: Rendered GameState.current_round_dict()
+        your_team: Rendered TeamState.to_json_dict() of the bidding team
+        opponent_teams: Rendered TeamState.to_json_dict() of each opponent, in order
+    """
+    if opponent_teams:
+        opponents = "[\n    " + ",\n    ".join(_reindent(t, 2) for t in opponent_teams) + "\n  ]"
+    else:
+        opponents = "[]"
+    return (
+        '{\n  "CurrentRound": ' + _reindent(current_round, 1)
+        + ',\n  "YourTeam": ' + _reindent(your_team, 1)
+        + ',\n  "OpponentTeams": ' + opponents
+        + "\n}"
+    )
+
+
 class GameState(BaseModel):
     """
     Complete game state passed to LLM for decision making.
     This is what each team agent sees when making a bid.
     """
+    model_config = FROZEN
+    
     current_item: Item = Field(..., description="Item currently being auctioned")
     my_team: TeamState = Field(..., description="State of the bidding team")
     opponent_teams: list[TeamState] = Field(..., description="States of all opponent teams")
     remaining_items: list[Item] = Field(..., description="Items still to be auctioned")
-    auction_history: list[AuctionResult] = Field(default_factory=list, description="Results of previous auctions")
+    auction_history: tuple[AuctionResult, ...] = Field((), description="Results of previous auctions")
     current_iteration: int = Field(1, ge=1, description="Current iteration for this item")
     round_number: int = Field(1, ge=1, description="Current round/item number")
     current_highest_bid: int = Field(0, ge=0, description="Current highest bid for this item")
     current_highest_bidder: Optional[str] = Field(None, description="Team name with highest bid")
-    bids_history: list[Bid] = Field(default_factory=list, description="Bid history for current item")
+    bids_history: tuple[Bid, ...] = Field((), description="Bid history for current item")
     
     def to_json_format(self) -> GameStateJSON:
         """Convert to JSON format matching the specification."""
@@ -192,20 +311,89 @@ class GameState(BaseModel):
             OpponentTeams=opponent_teams
         )
     
+    def forced_bid(self, leader_holds: bool = False) -> Optional[int]:
+        """
+        Bid that is decided by the rules alone, without asking the LLM.
+        
+        A team whose budget cannot exceed the current highest bid cannot take
+        the lead (bids are capped at budget and only strictly higher bids
+        count), so its bid is 0 whatever the model would answer.
+        
+        Args:
+            leader_holds: Also answer for the current leader by repeating its
+                standing bid, instead of letting it raise its own price
+            
+        Returns:
+            The forced bid, or None if the LLM has a real decision to make
+        """
+        if self.my_team.budget <= self.current_highest_bid:
+            return 0
+        if leader_holds and self.current_highest_bidder == self.my_team.name:
+            return self.current_highest_bid
+        return None
+    
+    def to_json_dict(self) -> dict:
+        """
+        Build the specification JSON structure as plain dicts.
+        Same shape as to_json_format().model_dump(), without constructing
+        and validating the intermediate Pydantic models.
+        """
+        return {
+            "CurrentRound": self.current_round_dict(),
+            "YourTeam": _team_dict(self.my_team),
+            "OpponentTeams": [_team_dict(t) for t in self.opponent_teams]
+        }
+    
+    def current_round_dict(self) -> dict:
+        """
+        The CurrentRound part of to_json_dict().
+        It does not depend on the bidding team, so it is identical for all
+        teams within one iteration.
+        """
+        return {
+            "Item": _item_dict(self.current_item),
+            "CurrentHighestBid": {
+                "Bid": self.current_highest_bid,
+                "TeamName": self.current_highest_bidder
+            },
+            "BidsHistoryForCurrentItem": [
+                {"Bid": b.amount, "TeamName": b.team_name}
+                for b in self.bids_history
+            ],
+            "RoundNumber": self.round_number,
+            "RoundIteration": self.current_iteration
+        }
+    
     def to_prompt_context(self) -> str:
         """Convert game state to JSON string for LLM prompt."""
-        json_state = self.to_json_format()
-        return json_state.model_dump_json(indent=2)
+        return fastjson.dumps(self.to_json_dict(), indent=True)
 
 
 class GameConfig(BaseModel):
     """Configuration for a game session."""
+    model_config = FROZEN
+    
     scenario_file: str = Field(..., description="Path to scenario JSON file")
     team_prompts: list[str] = Field(..., description="List of team prompt file names (without .txt)")
     max_iterations: int = Field(45, ge=1, le=100, description="Max iterations per item auction")
     llm_provider: str = Field("google", description="LLM provider: 'google' or 'ollama'")
     llm_base_url: str = Field("http://localhost:11434/v1", description="Base URL for Ollama API")
     llm_model: str = Field(..., description="LLM model name (from .env)")
+    llm_max_concurrency: int = Field(8, ge=1, description="Max concurrent LLM calls per bidding iteration")
+    llm_rpm: Optional[int] = Field(None, ge=1, description="Provider rate limit in requests per minute (None = unlimited)")
+    llm_request_timeout: float = Field(60.0, gt=0, description="Seconds one LLM call may take before it is abandoned and retried")
+    llm_request_deadline: Optional[float] = Field(None, gt=0, description="Seconds one bid may spend across all retries (None = enough for every retry)")
+    llm_max_output_tokens: Optional[int] = Field(8, ge=1, description="Completion token cap per bid (None = no cap, for models that reason before answering)")
+    llm_stop_at_newline: bool = Field(True, description="Stop generation at the first newline of the bid")
+    http_max_connections: int = Field(64, ge=1, description="HTTP connection pool size for the LLM client")
+    http_max_keepalive: int = Field(32, ge=0, description="Idle keep-alive connections kept in the pool")
+    http2: bool = Field(False, description="Use HTTP/2 for the Ollama endpoint (needs httpx[http2])")
+    http_keepalive_expiry: float = Field(30.0, ge=0, description="Seconds before an idle connection is closed")
+    skip_unable_bidders: bool = Field(True, description="Bid 0 without an LLM call for teams that cannot outbid the leader")
+    leader_holds_bid: bool = Field(False, description="With skip_unable_bidders, also repeat the current leader's standing bid without an LLM call")
+    end_uncontested_auctions: bool = Field(False, description="Award the item as soon as no other team can outbid the leader (the leader can no longer raise its own bid)")
+    seed: Optional[int] = Field(None, description="Random seed for bid order shuffling (None = nondeterministic)")
+    save_game_states: bool = Field(False, description="Write every team's game_state JSON per iteration to the session dir (debug)")
     base_budget: int = Field(1500, ge=100, description="Base starting budget")
     budget_per_team: int = Field(200, ge=0, description="Additional budget per team")
     
@@ -216,6 +404,8 @@ class GameConfig(BaseModel):
 
 class FinalRanking(BaseModel):
     """Final ranking entry for a team."""
+    model_config = FROZEN
+    
     rank: int = Field(..., ge=1, description="Final rank (1 = winner)")
     team_name: str
     required_count: int = Field(..., description="Number of required items")
@@ -2,21 +2,30 @@
 Auction simulation engine - core game loop.
 """
 
+import asyncio
+import csv
+import io
 import json
 import logging
 import random
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from .models import (
     Item, Bid, AuctionResult, TeamState, GameState,
-    GameConfig, FinalRanking
+    GameConfig, FinalRanking, assemble_prompt_context, items_to_json
 )
+from . import fastjson
 from .team import Team
 from .llm_client import LLMClient
+from .log_writer import BackgroundWriter
 
 logger = logging.getLogger(__name__)
 
+# Scenario item fields and their specification-format (PascalCase) aliases
+_SCENARIO_KEYS = (("name", "Name"), ("quality", "Quality"), ("is_required", "IsRequired"))
+
 
 class AuctionEngine:
     """
@@ -41,22 +50,61 @@ class AuctionEngine:
         self.llm_client = LLMClient(
             provider=config.llm_provider,
             model=config.llm_model,
-            base_url=config.llm_base_url
+            base_url=config.llm_base_url,
+            request_timeout=config.llm_request_timeout,
+            request_deadline=config.llm_request_deadline,
+            max_connections=config.http_max_connections,
+            max_keepalive=config.http_max_keepalive,
+            keepalive_expiry=config.http_keepalive_expiry,
+            http2=config.http2,
+            max_concurrency=config.llm_max_concurrency,
+            max_output_tokens=config.llm_max_output_tokens,
+            stop_at_newline=config.llm_stop_at_newline,
+            requests_per_minute=config.llm_rpm,
+            prewarm=False
         )
         
         # Load items from scenario
         self.items = self._load_scenario()
-        self.remaining_items = list(self.items)
+        # Indices of items not yet auctioned (insertion-ordered, O(1) removal)
+        self._remaining: dict[int, None] = dict.fromkeys(range(len(self.items)))
         
         # Initialize teams (budget depends on team count)
         self.teams = self._init_teams()
+        self._team_index = {team.name: i for i, team in enumerate(self.teams)}
+        self._by_name = {team.name: team for team in self.teams}
+        
+        # Bid order for tie-breaking; seeded for reproducible runs
+        self._rng = random.Random(config.seed)
+        self._bid_order = list(self.teams)
         
-        # Initialize all_items cache for each team (once at game start)
+        # Initialize all_items cache for each team (once at game start);
+        # the JSON is rendered once and shared by all teams and all_items.json
+        self._all_items_json = items_to_json(self.items)
         for team in self.teams:
-            team.initialize_items(self.items)
+            team.initialize_items(self.items, self._all_items_json)
         
         # Track auction history
         self.auction_history: list[AuctionResult] = []
+        # Read-only view of auction_history handed to game states; extended
+        # once per finished auction instead of copied per team/iteration
+        self._history_snapshot: tuple[AuctionResult, ...] = ()
+        
+        # Session log progress: auctions already written, CSV files already created
+        self._logged_auctions = 0
+        self._started_csvs: set[Path] = set()
+        self._all_items_saved = False
+        self._log_writer = BackgroundWriter()
+        
+        # Bids answered by the rules vs. by the LLM
+        self.forced_bid_count = 0
+        self.llm_bid_count = 0
+        
+        # One event loop for the whole game: the async HTTP client is bound to it.
+        # The connection warm-up is only scheduled here; it runs once the loop
+        # first runs, alongside the first auction's bids, instead of blocking init.
+        self._loop = asyncio.new_event_loop()
+        self._prewarm_task = self._loop.create_task(self.llm_client.aprewarm())
         
         logger.info(
             f"Initialized AuctionEngine with {len(self.items)} items "
@@ -68,8 +116,7 @@ class AuctionEngine:
         scenario_path = Path(self.config.scenario_file)
         
         try:
-            with open(scenario_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = fastjson.loads(scenario_path.read_bytes())
             
             # Handle both formats: array or object with "items" key
             if isinstance(data, list):
@@ -79,15 +126,15 @@ class AuctionEngine:
             else:
                 raise ValueError("JSON must be an array or object with 'items' key")
             
-            # Normalize keys to lowercase (handle Name->name, Quality->quality, IsRequired->is_required)
+            # Normalize keys to lowercase (handle Name->name, Quality->quality, IsRequired->is_required).
+            # Each field is looked up once; a present key wins even when falsy (quality 0).
             items = []
             for item_data in items_data:
                 normalized = {
-                    "name": item_data.get("name") or item_data.get("Name"),
-                    "quality": item_data.get("quality") or item_data.get("Quality"),
-                    "is_required": item_data.get("is_required") if "is_required" in item_data else item_data.get("IsRequired")
+                    field: item_data[field] if field in item_data else item_data.get(alias)
+                    for field, alias in _SCENARIO_KEYS
                 }
-                items.append(Item(**normalized))
+                items.append(Item.model_validate(normalized))
             
             logger.info(f"Loaded {len(items)} items from {scenario_path}")
             return items
@@ -99,6 +146,19 @@ class AuctionEngine:
             logger.error(f"Error parsing scenario file: {e}")
             raise
     
+    @property
+    def remaining_items(self) -> list[Item]:
+        """Items still to be auctioned, in auction order."""
+        return [self.items[i] for i in self._remaining]
+    
+    def _remaining_except(self, item_index: int) -> list[Item]:
+        """
+        Items still to be auctioned, excluding the one at item_index.
+        Items compare equal by name, so later copies of the same name are excluded too.
+        """
+        name = self.items[item_index].name
+        return [self.items[i] for i in self._remaining if self.items[i].name != name]
+    
     def _init_teams(self) -> list[Team]:
         """Initialize all teams from prompt files."""
         teams = []
@@ -130,26 +190,131 @@ class AuctionEngine:
         round_number: int = 1,
         current_highest_bid: int = 0,
         current_highest_bidder: str | None = None,
-        bids_history: list[Bid] | None = None
+        bids_history: tuple[Bid, ...] = (),
+        remaining_items: list[Item] | None = None,
+        auction_history: tuple[AuctionResult, ...] | None = None,
+        all_states: list[TeamState] | None = None
     ) -> GameState:
-        """Build the game state from a specific team's perspective."""
-        opponent_states = [
-            t.get_state() for t in self.teams if t.name != team.name
-        ]
+        """
+        Build the game state from a specific team's perspective.
         
-        return GameState(
+        remaining_items and auction_history are the same for every team (and
+        every iteration) of one auction, and all_states (one state per team,
+        in self.teams order) is the same for every team of one iteration;
+        pass them in precomputed to avoid rebuilding them per team.
+        
+        Every field comes from engine-owned, already validated objects, so the
+        model is built with model_construct() and skips validation.
+        """
+        if all_states is None:
+            all_states = [t.get_state() for t in self.teams]
+        idx = self._team_index[team.name]
+        my_state = all_states[idx]
+        opponent_states = all_states[:idx] + all_states[idx + 1:]
+        
+        if remaining_items is None:
+            remaining_items = self._remaining_except(round_number - 1)
+        if auction_history is None:
+            auction_history = self._history_snapshot
+        
+        return GameState.model_construct(
             current_item=current_item,
-            my_team=team.get_state(),
+            my_team=my_state,
             opponent_teams=opponent_states,
-            remaining_items=[i for i in self.remaining_items if i != current_item],
-            auction_history=list(self.auction_history),
+            remaining_items=remaining_items,
+            auction_history=auction_history,
             current_iteration=iteration,
             round_number=round_number,
             current_highest_bid=current_highest_bid,
             current_highest_bidder=current_highest_bidder,
-            bids_history=bids_history or []
+            bids_history=bids_history
         )
     
+    def _render_prompt_contexts(
+        self,
+        game_states: list[GameState],
+        all_states: list[TeamState]
+    ) -> list[str]:
+        """
+        Render to_prompt_context() for every game state of one iteration.
+        
+        CurrentRound is the same for all teams and each team's JSON is the same
+        whether it is "YourTeam" or an opponent, so every fragment is serialized
+        once and the per-team documents are spliced together from them.
+        """
+        if not game_states:
+            return []
+        current_round = fastjson.dumps(game_states[0].current_round_dict(), indent=True)
+        team_json = [fastjson.dumps(state.to_json_dict(), indent=True) for state in all_states]
+        
+        contexts = []
+        for game_state in game_states:
+            idx = self._team_index[game_state.my_team.name]
+            contexts.append(assemble_prompt_context(
+                current_round,
+                team_json[idx],
+                team_json[:idx] + team_json[idx + 1:]
+            ))
+        return contexts
+    
+    def _collect_bids(
+        self,
+        teams: list[Team],
+        game_states: list[GameState],
+        prompt_contexts: list[str]
+    ) -> list[int]:
+        """
+        Ask every team for its bid in one concurrent batch of LLM calls.
+        Teams whose bid is forced by the rules (see GameState.forced_bid) are
+        answered directly unless config.skip_unable_bidders is off; with
+        config.leader_holds_bid the current leader is answered directly too.
+        Concurrency is bounded by config.llm_max_concurrency.
+        
+        Returns:
+            Bid amounts in the same order as teams
+        """
+        if self.config.skip_unable_bidders:
+            leader_holds = self.config.leader_holds_bid
+            bids: list[int | None] = [
+                game_state.forced_bid(leader_holds) for game_state in game_states
+            ]
+        else:
+            bids = [None] * len(game_states)
+        pending = [i for i, bid in enumerate(bids) if bid is None]
+        self.forced_bid_count += len(bids) - len(pending)
+        self.llm_bid_count += len(pending)
+        
+        if pending:
+            llm_bids = self._loop.run_until_complete(self._gather_bids(
+                [teams[i] for i in pending],
+                [game_states[i] for i in pending],
+                [prompt_contexts[i] for i in pending]
+            ))
+            for i, bid in zip(pending, llm_bids):
+                bids[i] = bid
+        
+        return bids
+    
+    async def _gather_bids(
+        self,
+        teams: list[Team],
+        game_states: list[GameState],
+        prompt_contexts: list[str]
+    ) -> list[int]:
+        """
+        Send the bid requests of all teams as one batch through the LLM client
+        (at most llm_max_concurrency in flight) and resolve the responses.
+        """
+        requests = [
+            team.build_request(game_state, prompt_context)
+            for team, game_state, prompt_context in zip(teams, game_states, prompt_contexts)
+        ]
+        responses = await self.llm_client.chat_many_async(requests)
+        return [
+            team.resolve_bid(response, game_state)
+            for team, game_state, response in zip(teams, game_states, responses)
+        ]
+    
     def _run_single_auction(self, item: Item, round_number: int = 1) -> AuctionResult:
         """
         Run auction for a single item.
@@ -157,26 +322,61 @@ class AuctionEngine:
         Auction ends when highest bid stays unchanged for 2 consecutive iterations.
         """
         all_bids: list[Bid] = []
-        winning_bids_history: list[Bid] = []  # Only highest bids from each iteration
+        # Only highest bids from each iteration. A tuple, so every game state of
+        # an iteration can share it as-is; it only grows when the lead changes.
+        winning_bids_history: tuple[Bid, ...] = ()
         
         # Track current highest bid for game state (from END of previous iteration)
         # This is what all teams see at the START of each iteration
         iteration_start_high_bid: int = 0
         iteration_start_high_bidder: str | None = None
         
+        # Constant for the whole auction of this item - build once, share across teams.
+        # round_number is the 1-based position of item in self.items.
+        remaining_items = self._remaining_except(round_number - 1)
+        auction_history = self._history_snapshot
+        
         for iteration in range(1, self.config.max_iterations + 1):
             logger.debug(f"Item '{item.name}' - Iteration {iteration}")
             
+            # If no other team can afford to outbid the leader, the outcome is
+            # settled - award the item without another round of LLM calls
+            if (
+                self.config.end_uncontested_auctions
+                and iteration_start_high_bidder is not None
+                and not any(
+                    t.state.budget > iteration_start_high_bid
+                    for t in self.teams if t.name != iteration_start_high_bidder
+                )
+            ):
+                winner = self._by_name[iteration_start_high_bidder]
+                winner.win_item(item, iteration_start_high_bid)
+                
+                logger.info(
+                    f"Iteration {iteration}: No team can outbid '{iteration_start_high_bidder}'. "
+                    f"'{iteration_start_high_bidder}' wins '{item.name}' for {iteration_start_high_bid}"
+                )
+                
+                return AuctionResult(
+                    item=item,
+                    winning_team=iteration_start_high_bidder,
+                    winning_bid=iteration_start_high_bid,
+                    all_bids=all_bids,
+                    iterations=iteration - 1
+                )
+            
             # Shuffle teams for fair tie-breaking
-            shuffled_teams = list(self.teams)
-            random.shuffle(shuffled_teams)
+            # (one list reused for the whole game, reshuffled in place)
+            shuffled_teams = self._bid_order
+            self._rng.shuffle(shuffled_teams)
             
             iteration_bids: list[Bid] = []
             
             # IMPORTANT: All teams see the SAME game_state within one iteration
             # This simulates simultaneous bidding - state is frozen from end of previous iteration
-            bids_history_snapshot = winning_bids_history.copy()
+            all_states = [t.get_state() for t in self.teams]
             
+            game_states: list[GameState] = []
             for team in shuffled_teams:
                 game_state = self._build_game_state(
                     team=team, 
@@ -185,15 +385,24 @@ class AuctionEngine:
                     round_number=round_number,
                     current_highest_bid=iteration_start_high_bid,
                     current_highest_bidder=iteration_start_high_bidder,
-                    bids_history=bids_history_snapshot  # Only winning bids from previous iterations
+                    bids_history=winning_bids_history,  # Only winning bids from previous iterations
+                    remaining_items=remaining_items,
+                    auction_history=auction_history,
+                    all_states=all_states
                 )
-                
-                # Save game_state to file for debugging
-                self._save_game_state(game_state, round_number, iteration)
-                
-                bid_amount = team.get_bid(game_state)
-                
-                bid = Bid(
+                game_states.append(game_state)
+            
+            prompt_contexts = self._render_prompt_contexts(game_states, all_states)
+            
+            # Save game_states to files for debugging (opt-in)
+            self._save_game_states(game_states, prompt_contexts, round_number, iteration)
+            
+            # Query all teams concurrently; results keep shuffle order for tie-breaking
+            bid_amounts = self._collect_bids(shuffled_teams, game_states, prompt_contexts)
+            
+            for team, bid_amount in zip(shuffled_teams, bid_amounts):
+                # Amounts are already clamped to [0, budget] by Team.resolve_bid
+                bid = Bid.model_construct(
                     team_name=team.name,
                     amount=bid_amount,
                     iteration=iteration
@@ -203,23 +412,22 @@ class AuctionEngine:
             
             # After ALL teams have bid, find the highest bid from THIS iteration
             if iteration_bids:
-                max_bid = max(iteration_bids, key=lambda b: b.amount)
+                # Single pass: strictly-greater comparison keeps the FIRST maximal
+                # bid in shuffle order, which is the tie-break rule
+                max_bid = iteration_bids[0]
+                for b in iteration_bids:
+                    if b.amount > max_bid.amount:
+                        max_bid = b
                 
                 # Check if anyone outbid the current highest
                 if max_bid.amount > iteration_start_high_bid:
                     # New highest bid - update leader
                     iteration_start_high_bid = max_bid.amount
-                    # In case of tie, first in shuffle order wins
-                    tied_bids = [b for b in iteration_bids if b.amount == max_bid.amount]
-                    iteration_start_high_bidder = tied_bids[0].team_name
+                    iteration_start_high_bidder = max_bid.team_name
                     
-                    # Add winning bid to history
-                    winning_bid = Bid(
-                        team_name=iteration_start_high_bidder,
-                        amount=iteration_start_high_bid,
-                        iteration=iteration
-                    )
-                    winning_bids_history.append(winning_bid)
+                    # Add winning bid to history (Bid is frozen, so the
+                    # iteration's bid object is shared rather than rebuilt)
+                    winning_bids_history += (max_bid,)
                     
                     # Log iteration results
                     logger.info(
@@ -233,7 +441,7 @@ class AuctionEngine:
                     )
                     
                     if iteration_start_high_bid > 0 and iteration_start_high_bidder:
-                        winner = next(t for t in self.teams if t.name == iteration_start_high_bidder)
+                        winner = self._by_name[iteration_start_high_bidder]
                         winner.win_item(item, iteration_start_high_bid)
                         
                         logger.info(
@@ -261,7 +469,7 @@ class AuctionEngine:
         
         # Max iterations reached - give item to current highest bidder
         if iteration_start_high_bid > 0 and iteration_start_high_bidder:
-            winner = next(t for t in self.teams if t.name == iteration_start_high_bidder)
+            winner = self._by_name[iteration_start_high_bidder]
             winner.win_item(item, iteration_start_high_bid)
             
             logger.info(
@@ -303,13 +511,13 @@ class AuctionEngine:
             
             result = self._run_single_auction(item, round_number=i)
             self.auction_history.append(result)
+            self._history_snapshot += (result,)
             
             # Save incremental logs after each auction
             self.save_session_logs()
             
             # Remove from remaining items
-            if item in self.remaining_items:
-                self.remaining_items.remove(item)
+            self._remaining.pop(i - 1, None)
             
             if result.winning_team:
                 logger.info(
@@ -318,6 +526,13 @@ class AuctionEngine:
             else:
                 logger.info("No winner - item not sold")
         
+        total_bids = self.forced_bid_count + self.llm_bid_count
+        if total_bids:
+            logger.info(
+                f"LLM calls skipped for forced bids: {self.forced_bid_count}/{total_bids} "
+                f"({100 * self.forced_bid_count / total_bids:.1f}%)"
+            )
+        
         # Calculate final rankings
         rankings = self._calculate_rankings()
         
@@ -340,107 +555,120 @@ class AuctionEngine:
         Calculate final rankings.
         Priority: Required count > Total quality > Remaining budget
         """
-        team_scores = []
-        
-        for team in self.teams:
-            state = team.get_state()
-            team_scores.append({
-                "name": team.name,
-                "required_count": state.required_count,
-                "total_quality": state.total_quality,
-                "budget": state.budget,
-                "items": [item.name for item in state.acquired_items]
-            })
-        
-        # Sort by ranking criteria (descending for all)
-        team_scores.sort(
-            key=lambda t: (t["required_count"], t["total_quality"], t["budget"]),
+        # Sort by ranking criteria (descending for all), reading the live
+        # states directly - no snapshot copies or intermediate dicts needed
+        ranked = sorted(
+            (team.state for team in self.teams),
+            key=lambda s: (s.required_count, s.total_quality, s.budget),
             reverse=True
         )
         
-        rankings = []
-        for rank, team_data in enumerate(team_scores, 1):
-            rankings.append(FinalRanking(
+        rankings = [
+            FinalRanking(
                 rank=rank,
-                team_name=team_data["name"],
-                required_count=team_data["required_count"],
-                total_quality=team_data["total_quality"],
-                remaining_budget=team_data["budget"],
-                items=team_data["items"]
-            ))
+                team_name=state.name,
+                required_count=state.required_count,
+                total_quality=state.total_quality,
+                remaining_budget=state.budget,
+                items=[item.name for item in state.acquired_items]
+            )
+            for rank, state in enumerate(ranked, 1)
+        ]
         
         return rankings
     
-    def get_detailed_logs(self) -> list[dict]:
+    def get_detailed_logs(self) -> Iterator[dict]:
         """
         Get detailed logs for CSV export.
-        Returns one row per bid.
+        Yields one row per bid, so rows can be written without holding them all.
         """
-        logs = []
-        
-        for result in self.auction_history:
+        return self._detailed_rows(self.auction_history)
+    
+    @staticmethod
+    def _detailed_rows(results: list[AuctionResult]) -> Iterator[dict]:
+        """One detailed-log row per bid of the given auction results."""
+        for result in results:
+            item_fields = {
+                "item_name": result.item.name,
+                "item_quality": result.item.quality,
+                "item_required": result.item.is_required,
+            }
             for bid in result.all_bids:
-                logs.append({
-                    "item_name": result.item.name,
-                    "item_quality": result.item.quality,
-                    "item_required": result.item.is_required,
+                yield {
+                    **item_fields,
                     "team_name": bid.team_name,
                     "bid_amount": bid.amount,
                     "iteration": bid.iteration,
                     "won": bid.team_name == result.winning_team and bid.amount == result.winning_bid,
                     "winning_bid": result.winning_bid
-                })
+                }
+    
+    def _append_csv(self, path: Path, fieldnames: list[str], rows: Iterator[dict]) -> None:
+        """
+        Append rows to a session CSV file (rendered here, written in the background).
+        The first write creates the file with a header; nothing is written
+        (and no file created) while there are no rows.
+        """
+        first_row = next(rows, None)
+        if first_row is None:
+            return
         
-        return logs
+        started = path in self._started_csvs
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not started:
+            writer.writerow(fieldnames)
+            self._started_csvs.add(path)
+        # Positional rows via itemgetter skip DictWriter's per-row key checks
+        row = itemgetter(*fieldnames)
+        writer.writerow(row(first_row))
+        writer.writerows(map(row, rows))
+        self._log_writer.write(path, buffer.getvalue(), append=started)
     
     def save_session_logs(self) -> None:
         """
         Save current state of logs to session directory.
         Called incrementally during game and on interruption.
+        
+        The CSV logs are append-only: each call writes only the auctions
+        finished since the previous call. Files are rendered here and written
+        by a background thread; close() waits for pending writes.
         """
         if not self.session_dir:
             return
         
-        import csv
-        from .models import ItemJSON
-        
         # Save all_items.json (once)
-        all_items_path = self.session_dir / "all_items.json"
-        if not all_items_path.exists():
-            items_json = [
-                ItemJSON(Name=item.name, Quality=item.quality, IsRequired=item.is_required)
-                for item in self.items
-            ]
-            with open(all_items_path, "w", encoding="utf-8") as f:
-                json.dump([item.model_dump() for item in items_json], f, indent=2)
-        
-        # Save detailed logs (all bids)
-        detailed_logs_path = self.session_dir / "detailed_logs.csv"
-        logs = self.get_detailed_logs()
-        if logs:
-            with open(detailed_logs_path, "w", newline="", encoding="utf-8") as f:
-                fieldnames = [
+        if not self._all_items_saved:
+            self._log_writer.write(self.session_dir / "all_items.json", self._all_items_json)
+            self._all_items_saved = True
+        
+        new_results = self.auction_history[self._logged_auctions:]
+        if new_results:
+            # Append detailed logs (all bids)
+            self._append_csv(
+                self.session_dir / "detailed_logs.csv",
+                [
                     "item_name", "item_quality", "item_required",
                     "team_name", "bid_amount", "iteration", "won", "winning_bid"
-                ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(logs)
-        
-        # Save auction results summary
-        auction_summary_path = self.session_dir / "auction_results.csv"
-        if self.auction_history:
-            with open(auction_summary_path, "w", newline="", encoding="utf-8") as f:
-                fieldnames = ["item_name", "winner", "winning_bid", "iterations"]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for result in self.auction_history:
-                    writer.writerow({
+                ],
+                self._detailed_rows(new_results)
+            )
+            
+            # Append auction results summary
+            self._append_csv(
+                self.session_dir / "auction_results.csv",
+                ["item_name", "winner", "winning_bid", "iterations"],
+                (
+                    {
                         "item_name": result.item.name,
                         "winner": result.winning_team or "None",
                         "winning_bid": result.winning_bid,
                         "iterations": result.iterations
-                    })
+                    }
+                    for result in new_results
+                )
+            )
+            self._logged_auctions = len(self.auction_history)
         
         # Save current team states
         team_states_path = self.session_dir / "team_states.json"
@@ -452,35 +680,48 @@ class AuctionEngine:
                 "budget": state.budget,
                 "acquired_items": [item.name for item in state.acquired_items]
             })
-        with open(team_states_path, "w", encoding="utf-8") as f:
-            json.dump(team_states, f, indent=2)
+        self._log_writer.write(team_states_path, json.dumps(team_states, indent=2))
         
         logger.debug(f"Session logs saved to: {self.session_dir}")
     
-    def _save_game_state(self, game_state: GameState, round_number: int, iteration: int) -> None:
+    def _save_game_states(
+        self,
+        game_states: list[GameState],
+        prompt_contexts: list[str],
+        round_number: int,
+        iteration: int
+    ) -> None:
         """
-        Save game_state JSON for debugging.
+        Save the game_state JSON of every team in one iteration, for debugging.
         Organized in folders: game_states/round_X/iter_Y/team_NAME.json
+        
+        This costs one file per team per iteration, so it only runs when
+        config.save_game_states is enabled.
         """
-        if not self.session_dir:
+        if not self.session_dir or not self.config.save_game_states:
             return
         
-        # Create nested folder structure
+        # Create nested folder structure (once per iteration)
         states_dir = self.session_dir / "game_states" / f"round_{round_number}" / f"iter_{iteration}"
         states_dir.mkdir(parents=True, exist_ok=True)
         
-        # Filename: team_jj.json
-        filename = f"team_{game_state.my_team.name}.json"
-        filepath = states_dir / filename
-        
-        # Save as formatted JSON
-        game_state_json = game_state.to_prompt_context()
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(game_state_json)
+        for game_state, prompt_context in zip(game_states, prompt_contexts):
+            # Filename: team_jj.json; content is the already rendered prompt JSON
+            filepath = states_dir / f"team_{game_state.my_team.name}.json"
+            self._log_writer.write(filepath, prompt_context)
     
     def close(self):
         """Clean up resources."""
+        self._log_writer.close()
         self.llm_client.close()
+        if not self._loop.is_closed():
+            if not self._prewarm_task.done():
+                self._prewarm_task.cancel()
+                self._loop.run_until_complete(
+                    asyncio.gather(self._prewarm_task, return_exceptions=True)
+                )
+            self._loop.run_until_complete(self.llm_client.aclose())
+            self._loop.close()
     
     def __enter__(self):
         return self
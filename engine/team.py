@@ -2,17 +2,25 @@
 Team agent that uses LLM to make bidding decisions.
 """
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from .models import GameState, TeamState, Item, ItemJSON
+from .models import GameState, TeamState, Item, items_to_json
 from .llm_client import LLMClient
 
 logger = logging.getLogger(__name__)
 
+# Sampling temperature used for bid requests
+BID_TEMPERATURE = 0.7
+
+# Fixed closing part of every bid request's user message
+_USER_MESSAGE_SUFFIX = """
+
+Based on all_items and game_state JSON above, determine your bid.
+Respond with ONLY a single integer (your bid amount). Nothing else."""
+
 
 def debug_dump(content: str, filename: str | None = None, subfolder: str = "debug") -> None:
     """
@@ -76,30 +84,34 @@ class Team:
             acquired_items=[]
         )
         
+        # Snapshot returned by get_state(), invalidated whenever state changes
+        self._state_snapshot: Optional[TeamState] = None
+        
         # Cache for all_items (set once at game start, doesn't change)
         self._all_items: list[Item] = []
         self._all_items_json: str = "[]"
+        self._user_message_prefix = self._build_user_message_prefix()
     
-    def initialize_items(self, all_items: list[Item]) -> None:
+    def initialize_items(self, all_items: list[Item], all_items_json: Optional[str] = None) -> None:
         """
         Initialize the cached all_items list. Called once at game start.
         
         Args:
             all_items: Complete list of all auction items in the game
+            all_items_json: items_to_json(all_items), if already rendered (shared by all teams)
         """
         self._all_items = all_items
-        # Pre-compute JSON representation for efficiency
-        items_json = [
-            ItemJSON(Name=item.name, Quality=item.quality, IsRequired=item.is_required)
-            for item in all_items
-        ]
-        import json
-        self._all_items_json = json.dumps(
-            [item.model_dump() for item in items_json],
-            indent=2
-        )
+        # Pre-compute JSON representation and the message prefix that embeds it
+        if all_items_json is None:
+            all_items_json = items_to_json(all_items)
+        self._all_items_json = all_items_json
+        self._user_message_prefix = self._build_user_message_prefix()
         logger.info(f"Team '{self.name}' initialized with {len(all_items)} items")
     
+    def _build_user_message_prefix(self) -> str:
+        """Invariant opening of every user message, up to the game_state JSON."""
+        return f"all_items:\n{self._all_items_json}\n\ngame_state:\n"
+    
     def _load_prompt(self) -> str:
         """Load the system prompt from file."""
         try:
@@ -114,40 +126,44 @@ class Team:
             logger.error(f"Error loading prompt for team '{self.name}': {e}")
             raise
     
-    def get_bid(self, game_state: GameState) -> int:
+    def build_user_message(self, game_state: GameState, prompt_context: Optional[str] = None) -> str:
         """
-        Get a bid from this team for the current item.
+        Build the user message for the LLM: all_items plus the current game_state.
         
         Args:
             game_state: Current state of the game from this team's perspective
-            
-        Returns:
-            Bid amount (0 if LLM fails or returns invalid response)
+            prompt_context: game_state.to_prompt_context(), if already rendered by the caller
         """
         # Convert game state to JSON format
-        game_state_json = game_state.to_prompt_context()
+        game_state_json = prompt_context if prompt_context is not None else game_state.to_prompt_context()
         
         # Build user message with both all_items and game_state
-        user_message = f"""all_items:
-{self._all_items_json}
-
-game_state:
-{game_state_json}
-
-Based on all_items and game_state JSON above, determine your bid.
-Respond with ONLY a single integer (your bid amount). Nothing else."""
+        user_message = "".join((self._user_message_prefix, game_state_json, _USER_MESSAGE_SUFFIX))
         
         # Uncomment to debug: dump user_message to file
         # debug_dump(user_message, filename=f"{self.name}_{game_state.current_item.name}_iter{game_state.current_iteration}.txt")
         
-        # Call LLM
-        logger.debug(f"Team '{self.name}' requesting bid for item '{game_state.current_item.name}'")
-        response = self.llm_client.chat_completion(
-            system_prompt=self.system_prompt,
-            user_message=user_message
-        )
+        return user_message
+    
+    def build_request(
+        self,
+        game_state: GameState,
+        prompt_context: Optional[str] = None
+    ) -> tuple[str, str, float]:
+        """(system_prompt, user_message, temperature) for this team's bid request."""
+        return self.system_prompt, self.build_user_message(game_state, prompt_context), BID_TEMPERATURE
+    
+    def resolve_bid(self, response: Optional[str], game_state: GameState) -> int:
+        """
+        Turn a raw LLM response into a valid bid for this team.
         
-        # Parse response
+        Args:
+            response: Raw LLM response (None if the call failed)
+            game_state: Game state the response was produced for
+            
+        Returns:
+            Bid amount (0 if the response is invalid), capped at the team's budget
+        """
         bid = self.llm_client.parse_bid_response(response)
         
         # Validate bid doesn't exceed budget
@@ -161,6 +177,28 @@ Respond with ONLY a single integer (your bid amount). Nothing else."""
         logger.info(f"Team '{self.name}' bids {bid} for '{game_state.current_item.name}'")
         return bid
     
+    def get_bid(self, game_state: GameState) -> int:
+        """
+        Get a bid from this team for the current item.
+        
+        Args:
+            game_state: Current state of the game from this team's perspective
+            
+        Returns:
+            Bid amount (0 if LLM fails or returns invalid response)
+        """
+        user_message = self.build_user_message(game_state)
+        
+        # Call LLM
+        logger.debug(f"Team '{self.name}' requesting bid for item '{game_state.current_item.name}'")
+        response = self.llm_client.chat_completion(
+            system_prompt=self.system_prompt,
+            user_message=user_message,
+            temperature=BID_TEMPERATURE
+        )
+        
+        return self.resolve_bid(response, game_state)
+    
     def win_item(self, item, price: int):
         """
         Record that this team won an item.
@@ -169,16 +207,24 @@ Respond with ONLY a single integer (your bid amount). Nothing else."""
             item: The Item that was won
             price: The price paid
         """
-        self.state.budget -= price
-        self.state.acquired_items.append(item)
+        self.state.add_acquired(item, price)
+        self._state_snapshot = None
         logger.info(
             f"Team '{self.name}' won '{item.name}' for {price}. "
             f"Remaining budget: {self.state.budget}"
         )
     
     def get_state(self) -> TeamState:
-        """Get current team state."""
-        return self.state.model_copy(deep=True)
+        """
+        Get a snapshot of the current team state.
+        
+        The snapshot is cached until the state changes (win_item), so all game
+        states built between two wins share one copy; callers must treat it as
+        read-only.
+        """
+        if self._state_snapshot is None:
+            self._state_snapshot = self.state.snapshot()
+        return self._state_snapshot
     
     def __repr__(self) -> str:
         return f"Team(name='{self.name}', budget={self.state.budget}, items={len(self.state.acquired_items)})"
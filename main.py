@@ -5,7 +5,7 @@ Main entry point with CLI interface.
 
 import argparse
 import csv
-import json
+import functools
 import logging
 import os
 import sys
@@ -14,12 +14,6 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-from engine.models import GameConfig
-from engine.simulation import AuctionEngine
-
-# Load environment variables
-load_dotenv()
-
 
 def setup_logging(verbose: bool = False):
     """Configure logging."""
@@ -32,39 +26,32 @@ def setup_logging(verbose: bool = False):
     )
 
 
+@functools.lru_cache(maxsize=None)
+def _list_stems(directory: Path, suffix: str) -> tuple[str, ...]:
+    """
+    Names (without suffix) of the files in directory that end with suffix.
+    Cached: the directories do not change during one CLI invocation.
+    """
+    if not os.path.isdir(directory):
+        return ()
+    # DirEntry carries the name and file type from the directory read itself,
+    # so no Path objects or extra stat() calls are needed per entry
+    with os.scandir(directory) as entries:
+        return tuple(
+            entry.name[:-len(suffix)]
+            for entry in entries
+            if entry.name.endswith(suffix) and entry.is_file()
+        )
+
+
 def get_available_scenarios(items_dir: Path) -> list[str]:
     """List available scenario files."""
-    if not items_dir.exists():
-        return []
-    return [f.stem for f in items_dir.glob("*.json")]
+    return list(_list_stems(items_dir, ".json"))
 
 
 def get_available_teams(prompts_dir: Path) -> list[str]:
     """List available team prompt files."""
-    if not prompts_dir.exists():
-        return []
-    return [f.stem for f in prompts_dir.glob("*.txt")]
-
-
-def export_detailed_logs(logs: list[dict], output_path: Path):
-    """Export detailed bid logs to CSV."""
-    if not logs:
-        print("No logs to export")
-        return
-    
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    fieldnames = [
-        "item_name", "item_quality", "item_required",
-        "team_name", "bid_amount", "iteration", "won", "winning_bid"
-    ]
-    
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(logs)
-    
-    print(f"Detailed logs exported to: {output_path}")
+    return list(_list_stems(prompts_dir, ".txt"))
 
 
 def export_results(rankings: list, output_path: Path):
@@ -76,33 +63,34 @@ def export_results(rankings: list, output_path: Path):
         "total_quality", "remaining_budget", "items"
     ]
     
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for r in rankings:
-            writer.writerow({
-                "rank": r.rank,
-                "team_name": r.team_name,
-                "required_count": r.required_count,
-                "total_quality": r.total_quality,
-                "remaining_budget": r.remaining_budget,
-                "items": "; ".join(r.items)
-            })
+    with open(output_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            (r.rank, r.team_name, r.required_count, r.total_quality, r.remaining_budget, "; ".join(r.items))
+            for r in rankings
+        )
     
     print(f"Results exported to: {output_path}")
 
 
 def main():
+    # Load environment variables (before the parser reads them as defaults).
+    # Done here rather than at import time, and from the project's .env
+    # directly instead of searching parent directories for one.
+    load_dotenv(Path(__file__).parent / ".env")
+    
     parser = argparse.ArgumentParser(
         description="Wolf of Allegro - LLM Auction Game",
         formatter_class=argparse.RawDescriptionHelpFormatter,
+        fromfile_prefix_chars="@",
         epilog="""
 Examples:
   python main.py --scenario standard --teams 1 2
   python main.py --scenario trap --teams 1 2 --max-iterations 45
   python main.py --list-scenarios
   python main.py --list-teams
+  python main.py @run.args        (arguments read from a file, one per line)
         """
     )
     
@@ -139,6 +127,22 @@ Examples:
         default=os.getenv("LLM_MODEL"),
         help="LLM model name (from .env: LLM_MODEL)"
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for the per-iteration team shuffle (reproducible runs)"
+    )
+    parser.add_argument(
+        "--save-game-states",
+        action="store_true",
+        help="Save every team's game_state JSON per iteration to the session dir (debug, slow)"
+    )
+    parser.add_argument(
+        "--end-uncontested-auctions",
+        action="store_true",
+        help="Award an item as soon as no other team can outbid the leader (skips the leader's own raises)"
+    )
     parser.add_argument(
         "--output", "-o",
         type=Path,
@@ -226,16 +230,34 @@ Examples:
             print("Available teams:", get_available_teams(prompts_dir))
             sys.exit(1)
     
+    # Engine imports pull in pydantic/httpx; deferred so --list-* stay fast
+    from engine import fastjson
+    from engine.models import GameConfig
+    from engine.simulation import AuctionEngine
+    
     # Build config
     llm_provider = os.getenv("LLM_PROVIDER", "google")
+    llm_rpm = os.getenv("LLM_RPM")
+    llm_request_deadline = os.getenv("LLM_REQUEST_DEADLINE")
+    # 0 lifts the completion cap (for models that reason before answering)
+    llm_max_output_tokens = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "8"))
+    llm_stop_at_newline = os.getenv("LLM_STOP_AT_NEWLINE", "1").lower() not in ("0", "false", "no")
     
     config = GameConfig(
         scenario_file=str(scenario_file),
         team_prompts=args.teams,
         max_iterations=args.max_iterations,
+        seed=args.seed,
+        save_game_states=args.save_game_states,
+        end_uncontested_auctions=args.end_uncontested_auctions,
         llm_provider=llm_provider,
         llm_base_url=args.llm_url,
         llm_model=args.llm_model,
+        llm_rpm=int(llm_rpm) if llm_rpm else None,
+        llm_request_timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "60")),
+        llm_request_deadline=float(llm_request_deadline) if llm_request_deadline else None,
+        llm_max_output_tokens=llm_max_output_tokens or None,
+        llm_stop_at_newline=llm_stop_at_newline,
         base_budget=int(os.getenv("BASE_BUDGET", "1500")),
         budget_per_team=int(os.getenv("BUDGET_PER_TEAM", "200"))
     )
@@ -269,16 +291,16 @@ Examples:
     
     # Save run configuration
     config_path = session_dir / "run_config.json"
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "timestamp": timestamp,
-            "scenario": args.scenario,
-            "teams": args.teams,
-            "starting_budget": starting_budget,
-            "max_iterations": args.max_iterations,
-            "llm_model": args.llm_model,
-            "llm_url": args.llm_url
-        }, f, indent=2)
+    config_path.write_bytes(fastjson.dumps_bytes({
+        "timestamp": timestamp,
+        "scenario": args.scenario,
+        "teams": args.teams,
+        "starting_budget": starting_budget,
+        "max_iterations": args.max_iterations,
+        "seed": args.seed,
+        "llm_model": args.llm_model,
+        "llm_url": args.llm_url
+    }, indent=True))
     
     print(f"Session logs: {session_dir}\n")
     
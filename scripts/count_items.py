@@ -5,7 +5,11 @@ Podsumowuje ile czego jest w każdym secie.
 
 import json
 from pathlib import Path
-from collections import Counter
+
+try:
+    import orjson
+except ImportError:  # opcjonalne przyspieszenie
+    orjson = None
 
 
 def analyze_item_set(json_file: Path):
@@ -19,8 +23,8 @@ def analyze_item_set(json_file: Path):
     print(f"📦 SET: {json_file.stem}")
     print(f"{'='*60}")
     
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    raw = json_file.read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     
     items = data.get("all_items", [])
     
@@ -28,42 +32,50 @@ def analyze_item_set(json_file: Path):
         print("⚠ Brak przedmiotów w secie")
         return
     
-    # Zlicz przedmioty po nazwie
-    item_counts = Counter(item["Name"] for item in items)
-    
-    # Podziel na required i optional
-    required_items = [item for item in items if item.get("IsRequired", False)]
-    optional_items = [item for item in items if not item.get("IsRequired", False)]
+    # Jedno przejście: jakości zgrupowane po (required, nazwa), w kolejności pierwszego wystąpienia
+    qualities_by_name: dict[bool, dict[str, list[int]]] = {True: {}, False: {}}
+    unique_names = set()
+    for item in items:
+        name = item["Name"]
+        unique_names.add(name)
+        group = qualities_by_name[bool(item.get("IsRequired", False))]
+        group.setdefault(name, []).append(item["Quality"])
     
-    required_counts = Counter(item["Name"] for item in required_items)
-    optional_counts = Counter(item["Name"] for item in optional_items)
+    required_qualities = qualities_by_name[True]
+    optional_qualities = qualities_by_name[False]
+    required_total = sum(map(len, required_qualities.values()))
+    optional_total = len(items) - required_total
     
     # Statystyki ogólne
     print(f"\n📊 STATYSTYKI OGÓLNE:")
     print(f"   Wszystkich przedmiotów: {len(items)}")
-    print(f"   Required: {len(required_items)}")
-    print(f"   Optional: {len(optional_items)}")
-    print(f"   Unikalnych nazw: {len(item_counts)}")
+    print(f"   Required: {required_total}")
+    print(f"   Optional: {optional_total}")
+    print(f"   Unikalnych nazw: {len(unique_names)}")
     
     # Required items
-    if required_counts:
-        print(f"\n✅ REQUIRED ITEMS ({len(required_items)} total):")
-        for name, count in required_counts.most_common():
-            qualities = [item["Quality"] for item in items if item["Name"] == name and item.get("IsRequired")]
-            avg_quality = sum(qualities) / len(qualities)
-            min_q, max_q = min(qualities), max(qualities)
-            print(f"   {count:2d}x {name}")
-            print(f"       Quality: avg={avg_quality:.1f}, min={min_q}, max={max_q}")
+    if required_qualities:
+        print(f"\n✅ REQUIRED ITEMS ({required_total} total):")
+        print_quality_stats(required_qualities)
     
     # Optional items
-    if optional_counts:
-        print(f"\n❌ OPTIONAL ITEMS ({len(optional_items)} total):")
-        for name, count in optional_counts.most_common():
-            qualities = [item["Quality"] for item in items if item["Name"] == name and not item.get("IsRequired")]
-            avg_quality = sum(qualities) / len(qualities)
-            min_q, max_q = min(qualities), max(qualities)
-            print(f"   {count:2d}x {name}")
-            print(f"       Quality: avg={avg_quality:.1f}, min={min_q}, max={max_q}")
+    if optional_qualities:
+        print(f"\n❌ OPTIONAL ITEMS ({optional_total} total):")
+        print_quality_stats(optional_qualities)
+
+
+def print_quality_stats(qualities_by_name: dict[str, list[int]]):
+    """
+    Wypisuje liczność i statystyki jakości dla każdej nazwy, od najczęstszej.
+    
+    Args:
+        qualities_by_name: Jakości przedmiotów pogrupowane po nazwie
+    """
+    # sorted jest stabilne - remisy zostają w kolejności pierwszego wystąpienia (jak Counter.most_common)
+    for name, qualities in sorted(qualities_by_name.items(), key=lambda kv: len(kv[1]), reverse=True):
+        avg_quality = sum(qualities) / len(qualities)
+        print(f"   {len(qualities):2d}x {name}")
+        print(f"       Quality: avg={avg_quality:.1f}, min={min(qualities)}, max={max(qualities)}")
 
 
 def analyze_all_sets(parsed_items_dir: Path):
@@ -5,14 +5,30 @@ Użycie: python load_dataset.py
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import itertools
+import os
+import threading
 import time
 import urllib3
+from urllib3.util.retry import Retry
 import re
 import json
 
-# Wyłącz ostrzeżenia o niezweryfikowanym SSL (dla dev środowiska)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+try:
+    import orjson
+except ImportError:  # opcjonalne przyspieszenie
+    orjson = None
+
+# Weryfikacja certyfikatu TLS; wyłączać (False) tylko dla dev środowiska z certyfikatem,
+# którego nie ma w lokalnym magazynie zaufanych CA
+VERIFY_SSL = True
+
+if not VERIFY_SSL:
+    # Wyłącz ostrzeżenia o niezweryfikowanym SSL (dla dev środowiska)
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Hardcodowany base URL (zmień na właściwy)
 BASE_URL = "https://dev.vabank.fintech.allegrogroup.com/funai/Tournaments/Live?auctionId=2903028798771796992"
@@ -21,6 +37,46 @@ BASE_URL = "https://dev.vabank.fintech.allegrogroup.com/funai/Tournaments/Live?a
 START_ROUND = 1
 END_ROUND = 80
 
+# Liczba równoległych pobrań i minimalny odstęp między startami kolejnych requestów
+# (żeby nie obciążać serwera)
+MAX_WORKERS = 8
+MIN_REQUEST_INTERVAL = 0.5
+
+# Ponawianie tylko gdy serwer da znać, że jest przeciążony (429/5xx): wykładniczy backoff,
+# z uwzględnieniem nagłówka Retry-After - zamiast stałych przerw między requestami
+RETRY = Retry(
+    total=4,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    respect_retry_after_header=True
+)
+
+# Jedna sesja dla wszystkich rund: połączenia TCP/TLS są utrzymywane i ponownie używane
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=RETRY))
+session.verify = VERIFY_SSL
+
+# Wzorce danych przedmiotu w HTML-u rundy (kompilowane raz, na bajtach - plik nie jest dekodowany)
+ITEM_NAME_RE = re.compile(rb'<span id="round-item-name">([^<]+)</span>')
+ITEM_QUALITY_RE = re.compile(rb'<span id="round-item-quality">(\d+)</span>')
+
+_pace_lock = threading.Lock()
+_next_request_at = 0.0
+
+
+def wait_for_request_slot():
+    """
+    Czeka na swoją kolej, tak aby requesty startowały co najmniej
+    MIN_REQUEST_INTERVAL sekund po sobie (także przy pobieraniu równoległym).
+    """
+    global _next_request_at
+    with _pace_lock:
+        now = time.monotonic()
+        start_at = max(now, _next_request_at)
+        _next_request_at = start_at + MIN_REQUEST_INTERVAL
+    time.sleep(start_at - now)
+
 
 def fetch_round(base_url: str, round_number: int, output_dir: Path):
     """
@@ -36,17 +92,28 @@ def fetch_round(base_url: str, round_number: int, output_dir: Path):
     
     print(f"[Runda {round_number:2d}] Pobieranie z: {url}")
     
+    wait_for_request_slot()
+    
+    # Pobieramy do pliku .part i podmieniamy dopiero po udanym pobraniu - przerwany
+    # transfer nie zostawi uciętego pliku rundy, który potem uchodziłby za pobrany
+    part_file = output_file.with_suffix(".part")
+    
     try:
-        response = requests.get(url, timeout=30, verify=False)
-        response.raise_for_status()
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(response.text)
+        # Strona jest w UTF-8, więc bajty idą prosto na dysk - bez dekodowania do str i ponownego kodowania
+        with session.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            written = 0
+            with open(part_file, 'wb', buffering=1 << 20) as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    written += f.write(chunk)
         
-        print(f"[Runda {round_number:2d}] ✓ Zapisano ({len(response.text)} znaków)")
+        os.replace(part_file, output_file)
+        print(f"[Runda {round_number:2d}] ✓ Zapisano ({written} bajtów)")
         return True
         
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, OSError) as e:
+        part_file.unlink(missing_ok=True)
         print(f"[Runda {round_number:2d}] ✗ Błąd: {e}")
         return False
 
@@ -62,31 +129,30 @@ def parse_item_from_html(html_file: Path) -> dict | None:
         Słownik z Name, Quality, IsRequired lub None jeśli parsowanie się nie powiodło
     """
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        # Linia 556 (indeks 555 bo 0-based) - czytamy plik tylko do niej, bez listy wszystkich linii;
+        # tryb binarny, więc dekodowana jest tylko wyciągnięta nazwa, a nie cały plik
+        with open(html_file, 'rb') as f:
+            line = next(itertools.islice(f, 555, 556), None)
         
-        # Linia 556 (indeks 555 bo 0-based)
-        if len(lines) < 556:
-            print(f"⚠ {html_file.name}: Za mało linii ({len(lines)})")
+        if line is None:
+            print(f"⚠ {html_file.name}: Za mało linii (mniej niż 556)")
             return None
         
-        line = lines[555]
-        
         # Wyciągnij nazwę: <span id="round-item-name">Nazwa</span>
-        name_match = re.search(r'<span id="round-item-name">([^<]+)</span>', line)
+        name_match = ITEM_NAME_RE.search(line)
         
         # Wyciągnij quality: <span id="round-item-quality">88</span>
-        quality_match = re.search(r'<span id="round-item-quality">(\d+)</span>', line)
+        quality_match = ITEM_QUALITY_RE.search(line)
         
         # Sprawdź czy jest "(required)": <span id="round-item-required"> (required)</span>
-        is_required = '(required)' in line
+        is_required = b'(required)' in line
         
         if not name_match or not quality_match:
             print(f"⚠ {html_file.name}: Nie znaleziono danych w linii 556")
             return None
         
         return {
-            "Name": name_match.group(1),
+            "Name": name_match.group(1).decode('utf-8'),
             "Quality": int(quality_match.group(1)),
             "IsRequired": is_required
         }
@@ -107,8 +173,8 @@ def extract_all_items(downloaded_dir: Path, output_dir: Path):
     print(f"\n{'='*50}")
     print("Parsowanie pobranych plików...")
     
-    all_items = []
-    
+    rounds = []
+    html_files = []
     for round_num in range(START_ROUND, END_ROUND + 1):
         html_file = downloaded_dir / f"webpage_round_{round_num}.html"
         
@@ -116,17 +182,33 @@ def extract_all_items(downloaded_dir: Path, output_dir: Path):
             print(f"⚠ Brak pliku: {html_file.name}")
             continue
         
-        item = parse_item_from_html(html_file)
-        if item:
-            all_items.append(item)
-            print(f"[Runda {round_num:2d}] ✓ {item['Name']} (Q:{item['Quality']}, Req:{item['IsRequired']})")
+        rounds.append(round_num)
+        html_files.append(html_file)
+    
+    # Pliki są od siebie niezależne - parsowanie w osobnych procesach (omija GIL);
+    # map zwraca wyniki w kolejności rund
+    with ProcessPoolExecutor() as pool:
+        parsed = list(pool.map(parse_item_from_html, html_files, chunksize=8))
+    
+    all_items = [item for item in parsed if item]
+    
+    # Podsumowanie rund wypisane jednym printem zamiast osobnego na każdą rundę
+    report = "\n".join(
+        f"[Runda {round_num:2d}] ✓ {item['Name']} (Q:{item['Quality']}, Req:{item['IsRequired']})"
+        for round_num, item in zip(rounds, parsed) if item
+    )
+    if report:
+        print(report)
     
     # Zapisz do JSON
     output_dir.mkdir(exist_ok=True)
     output_file = output_dir / "all_items.json"
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({"all_items": all_items}, f, indent=2, ensure_ascii=False)
+    data = {"all_items": all_items}
+    if orjson is not None:
+        output_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        output_file.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
     
     print(f"\n{'='*50}")
     print(f"✓ Wyeksportowano {len(all_items)} przedmiotów")
@@ -141,19 +223,15 @@ if __name__ == "__main__":
     print(f"Pobieranie danych z {START_ROUND} do {END_ROUND} rundy")
     print(f"Katalog wyjściowy: {output_dir}\n")
     
-    success_count = 0
-    failed_count = 0
-    
     # Odkomentuj żeby pobrać pliki:
-    for round_num in range(START_ROUND, END_ROUND + 1):
-        if fetch_round(BASE_URL, round_num, output_dir):
-            success_count += 1
-        else:
-            failed_count += 1
-        
-        # Krótka przerwa między requestami (żeby nie obciążać serwera)
-        if round_num < END_ROUND:
-            time.sleep(1)
+    # Rundy pobierane równolegle; tempo requestów ogranicza wait_for_request_slot()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(
+            lambda round_num: fetch_round(BASE_URL, round_num, output_dir),
+            range(START_ROUND, END_ROUND + 1)
+        ))
+    success_count = sum(results)
+    failed_count = len(results) - success_count
     
     print(f"\n{'='*50}")
     print(f"Pobrano: {success_count}/{END_ROUND} rund")